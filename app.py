@@ -1,81 +1,370 @@
+from __future__ import annotations
+
 import streamlit as st
-from typing import List, Dict
-import math
-from openai import OpenAI
+from typing import TYPE_CHECKING, Dict
+import time
+import uuid
+
+if TYPE_CHECKING:
+    import pandas as pd  # annotations only; runtime imports stay deferred
+
+import numpy as np
+
+from sizing import (
+    calculate_number_of_panels,
+    calculate_number_of_batteries,
+    compute_load_totals,
+    _SMALL_N,
+    totals_from_arrays,
+    determine_system_voltage,
+    inverter_rating,
+    panel_sweep,
+)
+
+# Default technical specifications, hoisted to module scope so they are
+# built once at import instead of on every rerun
+DEFAULT_BATTERY_DOD = {"Lithium": 0.8, "Gel": 0.5}
+DEFAULT_PANEL_IMP = 11.0  # Current at max power (A)
+DEFAULT_PANEL_VOC = 53.3  # Open Circuit Voltage (V)
+DEFAULT_INVERTER_VMAX = 430.0  # Max MPPT Voltage (V)
+DEFAULT_INVERTER_VMIN = 120.0  # Min MPPT Voltage (V)
+DEFAULT_INVERTER_IC = 100.0  # Inverter Current (A)
 
 # Initialize OpenAI client with API key
 client = None
+async_client = None
+
+
+@st.cache_resource(show_spinner=False)
+def _get_clients(api_key: str) -> tuple:
+    """
+    Build the OpenAI clients once per API key. st.cache_resource keeps the
+    same instances — and their underlying HTTP connection pools — alive
+    across reruns, so re-entering the page does not tear down keep-alive
+    connections and pay fresh TCP/TLS setup on the next request.
+    """
+    # Imported here so cold start does not pay the OpenAI import cost
+    # unless the AI assistant is actually used
+    from openai import AsyncOpenAI, OpenAI
+    return OpenAI(api_key=api_key), AsyncOpenAI(api_key=api_key)
 
 
 def set_openai_api_key(api_key: str):
-    global client
-    client = OpenAI(api_key=api_key)
+    global client, async_client
+    # No-op when the bound client already matches: the per-rerun call from
+    # the assistant page then costs one attribute comparison, not even a
+    # cache lookup
+    if client is not None and client.api_key == api_key:
+        return
+    client, async_client = _get_clients(api_key)
+
+
+def gather_chats(message_batches: list) -> list:
+    """
+    Run several chat completions concurrently and return their texts in
+    order. N prompts complete in max(latency) rather than sum(latency);
+    concurrency is capped at 3 to stay under the API's connection limits.
+    """
+    import asyncio
+
+    async def _run():
+        semaphore = asyncio.Semaphore(3)
+
+        async def _chat(messages):
+            async with semaphore:
+                completion = await async_client.chat.completions.create(
+                    model="gpt-4o-mini", messages=messages)
+                return completion.choices[0].message.content.strip()
+
+        return await asyncio.gather(*(_chat(m) for m in message_batches))
+
+    return asyncio.run(_run())
 
 
 # ==============================================
 # ================ HELPER FUNCTIONS ============
 # ==============================================
 
-def calculate_daily_energy_usage(appliances: List[Dict]) -> float:
+def _hash_loads(loads: list) -> tuple:
     """
-    Calculate total daily energy usage (Wh) for a list of appliances.
+    Cache key for the loads list: pack the numeric fields into one
+    contiguous float64 buffer and hash its bytes plus the names, instead
+    of letting Streamlit's default hasher walk every dict.
     """
-    return sum(appl["wattage"] * appl["hours_per_day"] for appl in appliances)
+    numeric = np.asarray(
+        [(load["wattage"], load["quantity"], load["day_hours"],
+          load["night_hours"], float(load["surge"])) for load in loads],
+        dtype=np.float64,
+    ).tobytes()
+    return numeric, tuple(load["name"] for load in loads)
+
 
-def calculate_nighttime_energy_usage(appliances: List[Dict]) -> float:
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={list: _hash_loads})
+def cached_load_totals(loads: list) -> tuple:
+    """
+    Memoized load totals; repeated reruns with an unchanged table hit the
+    memo table instead of re-reducing the columns. Large tables reuse the
+    memoized DataFrame's columns as the SoA input rather than walking the
+    dicts a second time.
+    """
+    if len(loads) < _SMALL_N:
+        return compute_load_totals(loads)
+    df = loads_dataframe(loads)
+    return totals_from_arrays(
+        df["wattage"].to_numpy(dtype=np.float64),
+        df["quantity"].to_numpy(dtype=np.float64),
+        df["day_hours"].to_numpy(dtype=np.float64),
+        df["night_hours"].to_numpy(dtype=np.float64),
+        df["surge"].to_numpy(dtype=np.float64),
+    )
+
+
+@st.cache_data(max_entries=8, show_spinner=False, hash_funcs={list: _hash_loads})
+def loads_dataframe(loads: list):
     """
-    Calculate the total nighttime energy usage (Wh) for selected appliances.
+    Columnar view of the load table for display. Memoized on the same
+    packed key as the totals, so reruns that do not change the table reuse
+    the already-normalized frame instead of re-walking the list of dicts.
     """
-    return sum(appl["wattage"] * appl["night_hours"] for appl in appliances if appl["use_at_night"])
+    import pandas as pd
 
-def calculate_number_of_panels(total_wh: float, panel_wattage: float, sun_hours: float, efficiency: float) -> int:
+    return pd.DataFrame(loads)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_inverter(total_peak_power: float) -> tuple:
     """
-    Calculate the number of solar panels needed.
+    Memoized (inverter_size_rounded, system_voltage) for a given peak
+    power, shared by the page flow and the technical tab so the sizing
+    policy runs in exactly one place.
     """
-    total_wp = total_wh / (sun_hours * efficiency)
-    return math.ceil(total_wp / panel_wattage)
+    inverter_size_rounded = inverter_rating(total_peak_power)
+    return inverter_size_rounded, determine_system_voltage(inverter_size_rounded)
+
 
-def calculate_battery_capacity(total_wh: float, voltage: float, dod: float, efficiency: float) -> float:
+def _make_load(load_id: str, load_name: str, quantity: float, wattage: float,
+               day_hours: float, night_hours: float, surge: bool) -> Dict:
+    """
+    Build a load record with its derived fields, so the record shape is
+    defined in exactly one place for the add path and the restore path.
+    """
+    peak_power = wattage * quantity
+    return {
+        "id": load_id,
+        "name": load_name,
+        "quantity": quantity,
+        "wattage": wattage,
+        "day_hours": day_hours,
+        "night_hours": night_hours,
+        "surge": surge,
+        "peak_power": peak_power,
+        "peak_power_surge": peak_power * 3 if surge else peak_power,
+        "day_energy_demand": peak_power * day_hours,
+        "night_energy_demand": peak_power * night_hours,
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def _loads_db():
     """
-    Calculate required battery capacity (Ah).
+    Process-wide SQLite handle for load persistence. st.cache_resource
+    shares one connection across reruns, and the file outlives server
+    restarts, which session_state alone does not. Rows are keyed by
+    session so concurrent visitors never see or clobber each other's
+    tables.
     """
-    return total_wh / (voltage * dod * efficiency)
+    import sqlite3  # deferred: only the load pages touch persistence
 
-def calculate_number_of_batteries(total_ah: float, single_battery_ah: float) -> int:
+    conn = sqlite3.connect("loads.db", check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS loads ("
+        "session TEXT, id TEXT PRIMARY KEY, name TEXT, quantity REAL, "
+        "wattage REAL, day_hours REAL, night_hours REAL, surge INTEGER, "
+        "updated REAL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_loads_session ON loads(session)")
+    # Prune sessions nobody has touched within the TTL, so abandoned
+    # tables do not accumulate in the file forever
+    conn.execute("DELETE FROM loads WHERE updated < ?",
+                 (time.time() - _SESSION_TTL_S,))
+    conn.commit()
+    return conn
+
+
+# Saved rows untouched for this long are dropped at connection setup
+_SESSION_TTL_S = 30 * 24 * 3600
+
+
+def _session_key() -> str:
     """
-    Calculate the number of batteries needed.
+    Durable identifier for this browser tab, scoping every persistence
+    query. Minted once and carried in the URL query string, so a reload
+    or server restart — both of which clear session state — re-finds the
+    saved rows; session state only caches it between reruns.
     """
-    return math.ceil(total_ah / single_battery_ah)
+    key = st.session_state.get("session_key")
+    if key is None:
+        key = st.query_params.get("sid")
+        if key is None:
+            key = uuid.uuid4().hex
+            st.query_params["sid"] = key
+        st.session_state["session_key"] = key
+    return key
+
+
+def _load_row(load: Dict) -> tuple:
+    # Only the input fields are stored; derived columns are recomputed on
+    # restore by _make_load
+    return (_session_key(), load["id"], load["name"], load["quantity"],
+            load["wattage"], load["day_hours"], load["night_hours"],
+            int(load["surge"]), time.time())
+
+
+def _persist_load(load: Dict):
+    conn = _loads_db()
+    conn.execute("INSERT OR REPLACE INTO loads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                 _load_row(load))
+    conn.commit()
+
+
+def _persist_removals(ids):
+    conn = _loads_db()
+    session = _session_key()
+    conn.executemany("DELETE FROM loads WHERE session = ? AND id = ?",
+                     [(session, i) for i in ids])
+    conn.commit()
 
-def calculate_inverter_size(appliances: List[Dict]) -> float:
+
+def _persist_replace(loads: list):
+    conn = _loads_db()
+    conn.execute("DELETE FROM loads WHERE session = ?", (_session_key(),))
+    conn.executemany("INSERT INTO loads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     [_load_row(load) for load in loads])
+    conn.commit()
+
+
+def _restore_loads() -> list:
     """
-    Estimate inverter size (W).
+    Rebuild this session's saved load table, recomputing the derived
+    fields from the stored inputs.
     """
-    total_wattage = sum(appl["wattage"] for appl in appliances)
-    return total_wattage * 1.25
+    conn = _loads_db()
+    session = _session_key()
+    rows = conn.execute(
+        "SELECT id, name, quantity, wattage, day_hours, night_hours, surge "
+        "FROM loads WHERE session = ?", (session,)
+    ).fetchall()
+    if rows:
+        # Returning sessions stay ahead of the TTL pruning
+        conn.execute("UPDATE loads SET updated = ? WHERE session = ?",
+                     (time.time(), session))
+        conn.commit()
+    return [
+        _make_load(load_id, name, quantity, wattage, day_hours, night_hours, bool(surge))
+        for load_id, name, quantity, wattage, day_hours, night_hours, surge in rows
+    ]
+
 
-def determine_battery_voltage(system_size: float) -> int:
+def append_load(load_name: str, quantity: float, wattage: float,
+                day_hours: float, night_hours: float, surge: bool):
     """
-    Determine appropriate battery bank voltage.
+    Append a new load to the session table, update the running totals and
+    persist the row. Shared by both user flows.
     """
-    if system_size <= 1.5:
-        return 12
-    elif system_size <= 5:
-        return 24
-    else:
-        return 48
+    load = _make_load(uuid.uuid4().hex, load_name, quantity, wattage,
+                      day_hours, night_hours, surge)
+    st.session_state["loads"].append(load)
+    _add_to_totals(load)
+    _persist_load(load)
+
+
+def _add_to_totals(load: Dict):
+    """
+    O(1) incremental update of the running totals when a load is appended,
+    instead of re-reducing the whole table on the next rerun.
+    """
+    # Default to zeros rather than get_load_totals(): a lazy rebuild here
+    # would already include the just-appended load and double-count it
+    tp, tps, td, tn = st.session_state.get("load_totals", (0.0, 0.0, 0.0, 0.0))
+    st.session_state["load_totals"] = (
+        tp + load["peak_power"],
+        tps + load["peak_power_surge"],
+        td + load["day_energy_demand"],
+        tn + load["night_energy_demand"],
+    )
+    st.session_state["max_peak_power"] = max(
+        st.session_state.get("max_peak_power", 0.0), load["peak_power"])
+
+
+def get_load_totals() -> tuple:
+    """
+    Running (peak, surge, day energy, night energy) totals. Maintained
+    incrementally on add; rebuilt from the memoized reduction only after
+    wholesale edits invalidate them.
+    """
+    if "load_totals" not in st.session_state:
+        st.session_state["load_totals"] = cached_load_totals(st.session_state["loads"])
+    return st.session_state["load_totals"]
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_chat(messages: tuple) -> str:
+    # Memoize completions on the (role, content) message tuple: a re-click
+    # or rerun with an identical prompt is answered from the in-process
+    # cache instead of paying the network round-trip again. The client is
+    # read from the module global, never passed in (unhashable).
+    completion = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": role, "content": content} for role, content in messages],
+    )
+    return completion.choices[0].message.content.strip()
+
+
+def get_max_peak_power() -> float:
+    """
+    Largest single-load peak power. Tracked in O(1) on add like the running
+    totals; rebuilt with one scan only after wholesale edits drop it.
+    """
+    if "max_peak_power" not in st.session_state:
+        st.session_state["max_peak_power"] = max(
+            (load["peak_power"] for load in st.session_state["loads"]), default=0.0)
+    return st.session_state["max_peak_power"]
+
+
+def _stream_chat(messages: tuple) -> str:
+    """
+    Stream the completion into the page as tokens arrive and return the
+    joined text. Repeat prompts are served from a per-session buffer and
+    written at once; cold prompts show their first tokens after roughly
+    the time-to-first-token instead of the full response latency.
+    (st.cache_data cannot replay write_stream output, hence the separate
+    session-level memo for the streamed path.)
+    """
+    streamed = st.session_state.setdefault("streamed_responses", {})
+    if messages in streamed:
+        text = streamed[messages]
+        st.write(text)
+        return text
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": role, "content": content} for role, content in messages],
+        stream=True,
+    )
+    text = st.write_stream(
+        chunk.choices[0].delta.content or "" for chunk in stream)
+    if len(streamed) >= 32:
+        # Drop the oldest entry so the per-session buffer stays bounded
+        del streamed[next(iter(streamed))]
+    streamed[messages] = text
+    return text
+
 
 def get_recommendations(user_inputs: str, goals: str) -> str:
     # Use OpenAI API to get personalized recommendations
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": f"Based on these inputs: {user_inputs} and goals: {goals}, provide a personalized solar system sizing recommendation."}
-            ]
-        )
-        return completion.choices[0].message.content.strip()
+        return _cached_chat((
+            ("system", "You are a helpful assistant."),
+            ("user", f"Based on these inputs: {user_inputs} and goals: {goals}, provide a personalized solar system sizing recommendation."),
+        ))
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -83,14 +372,10 @@ def get_recommendations(user_inputs: str, goals: str) -> str:
 def answer_query(query: str) -> str:
     # Use OpenAI API to answer user queries
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": f"Answer this query: {query}"}
-            ]
-        )
-        return completion.choices[0].message.content.strip()
+        return _cached_chat((
+            ("system", "You are a helpful assistant."),
+            ("user", f"Answer this query: {query}"),
+        ))
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -98,268 +383,413 @@ def answer_query(query: str) -> str:
 # ================ STREAMLIT APP ==============
 # ==============================================
 
+LOAD_EDIT_COLUMNS = ["name", "quantity", "wattage", "day_hours", "night_hours", "surge"]
+
+# Battery catalogue pre-bucketed by bank voltage: an O(1) dict lookup per
+# rerun instead of re-filtering (and re-declaring) the flat options list
+# in every page that offers a battery selectbox
+BATTERIES_BY_VOLTAGE = {
+    v: [(v, ah) for ah in (75, 100, 200)] for v in (12, 24, 48)
+}
+
+# Panel catalogue, shared by the solar page and the technical solar tab
+PANEL_SIZES = [160, 320, 410, 475, 490, 550, 640]
+
+
+def _loads_from_editor(edited: pd.DataFrame, ids: pd.Series) -> list:
+    """
+    Rebuild the session loads from the edited grid. The derived columns are
+    recomputed as whole-table NumPy broadcasts rather than per-row Python
+    arithmetic; edited rows keep their stable id, new rows get a fresh one.
+    """
+    # Rows added through the grid's "+" affordance can arrive with empty
+    # cells, which to_numpy would turn into NaN and propagate through the
+    # derived columns, the totals and the persisted table. Drop rows that
+    # are missing numeric inputs and default the optional fields instead.
+    edited = edited.dropna(subset=["quantity", "wattage", "day_hours", "night_hours"])
+    edited = edited.assign(name=edited["name"].fillna(""),
+                           surge=edited["surge"].fillna(False))
+    quantity = edited["quantity"].to_numpy(dtype=np.float64)
+    wattage = edited["wattage"].to_numpy(dtype=np.float64)
+    day_hours = edited["day_hours"].to_numpy(dtype=np.float64)
+    night_hours = edited["night_hours"].to_numpy(dtype=np.float64)
+    surge = edited["surge"].to_numpy(dtype=bool)
+    peak_power = wattage * quantity
+    peak_power_surge = np.where(surge, peak_power * 3, peak_power)
+    day_energy_demand = peak_power * day_hours
+    night_energy_demand = peak_power * night_hours
+    # Assign every column in one shot and let pandas emit the records at
+    # C level, instead of building each row dict in the interpreter
+    rebuilt = edited.assign(
+        id=[ids.get(idx) or uuid.uuid4().hex for idx in edited.index],
+        quantity=quantity,
+        wattage=wattage,
+        day_hours=day_hours,
+        night_hours=night_hours,
+        surge=surge,
+        peak_power=peak_power,
+        peak_power_surge=peak_power_surge,
+        day_energy_demand=day_energy_demand,
+        night_energy_demand=night_energy_demand,
+    )
+    return rebuilt.to_dict("records")
+
+
+def _apply_removals():
+    """
+    on_click callback for batch load removal. Running in the callback
+    phase means the click's own rerun already sees the pruned table, so
+    no explicit second st.rerun() is needed. The running totals shrink by
+    the removed rows' contributions in O(k) instead of being dropped and
+    rebuilt from the whole table.
+    """
+    removed = set(st.session_state.get("tech_remove_loads", ()))
+    if not removed:
+        return
+    keep, dropped = [], []
+    for load in st.session_state["loads"]:
+        (dropped if load["id"] in removed else keep).append(load)
+    st.session_state["loads"] = keep
+    st.session_state["tech_remove_loads"] = []
+    _persist_removals(removed)
+    if "load_totals" in st.session_state:
+        tp, tps, td, tn = st.session_state["load_totals"]
+        for load in dropped:
+            tp -= load["peak_power"]
+            tps -= load["peak_power_surge"]
+            td -= load["day_energy_demand"]
+            tn -= load["night_energy_demand"]
+        st.session_state["load_totals"] = (tp, tps, td, tn)
+    # The max only needs a rescan if a removed row held it
+    current_max = st.session_state.get("max_peak_power")
+    if current_max is not None and any(load["peak_power"] >= current_max for load in dropped):
+        st.session_state.pop("max_peak_power", None)
+
+
+def _go_to_page(page: str, **state):
+    """
+    on_click callback for navigation buttons. Callbacks run before the
+    rerun triggered by the click, so the target page renders on that same
+    rerun instead of needing an explicit second st.rerun().
+    """
+    st.session_state.update(state)
+    st.session_state["page"] = page
+
+
+def require_loads():
+    """
+    Short-circuit pages that need loads: stop the rerun early instead of
+    computing and rendering zeros when nothing has been entered.
+    """
+    if not st.session_state.get("loads"):
+        st.warning("Add at least one load first.")
+        st.stop()
+
+
+def _submit_load():
+    """
+    Form-submit callback. Callbacks run before the post-click rerun and
+    before clear_on_submit resets the widgets, so the new load and totals
+    are already in session state when the table renders \u2014 no explicit
+    st.rerun() needed.
+    """
+    append_load(
+        st.session_state["add_load_name"],
+        st.session_state["add_load_quantity"],
+        st.session_state["add_load_wattage"],
+        st.session_state["add_load_day_hours"],
+        st.session_state["add_load_night_hours"],
+        st.session_state["add_load_surge"],
+    )
+
+
+def _add_load_form():
+    """
+    Load-entry form; submission is handled by the _submit_load callback.
+    Not a fragment: the submit click must rerun the whole script so the
+    table and totals outside this block pick up the new load.
+    """
+    # Batch the entry widgets into one form so the script reruns once on
+    # submit instead of on every individual widget change
+    with st.form("add_load", clear_on_submit=True):
+        st.text_input("Load Name", key="add_load_name")
+        st.number_input("Quantity", min_value=1.0, value=1.0, step=1.0, key="add_load_quantity")
+        st.number_input("Wattage (W)", min_value=1.0, value=100.0, step=1.0, key="add_load_wattage")
+        st.number_input("Day Hours", min_value=0.0, value=1.0, step=1.0, key="add_load_day_hours")
+        st.number_input("Night Hours", min_value=0.0, value=1.0, step=1.0, key="add_load_night_hours")
+        st.checkbox("Peak Power Surge", key="add_load_surge")
+        st.form_submit_button("Add Load", on_click=_submit_load)
+
+
+def _totals_metrics():
+    """
+    Shared metric block for the running load totals, rendered identically
+    by the page flow and the technical load tab.
+    """
+    (total_peak_power, total_peak_power_surge,
+     total_day_energy_demand, total_night_energy_demand) = get_load_totals()
+
+    st.metric("Total Peak Power", f"{total_peak_power} W")
+    st.metric("Total Peak Power Surge", f"{total_peak_power_surge} W")
+    st.metric("Total Day Energy Demand", f"{total_day_energy_demand} Wh")
+    st.metric("Total Night Energy Demand", f"{total_night_energy_demand} Wh")
+    st.metric("Largest Single Load", f"{get_max_peak_power()} W")
+
+
+def _inverter_section() -> tuple:
+    """
+    Shared inverter block: one computation and metric set for both flows.
+    Returns (inverter_size_rounded, system_voltage).
+    """
+    inverter_size_rounded, system_voltage = compute_inverter(get_load_totals()[0])
+
+    st.write("### Inverter Size and System Voltage")
+    st.metric("Inverter Size", f"{inverter_size_rounded} kVA")
+    st.metric("System Voltage", f"{system_voltage} V")
+    return inverter_size_rounded, system_voltage
+
+
+def _battery_bank_section(system_voltage: int, key: str) -> tuple:
+    """
+    Shared battery-bank block; only the widget key differs between flows.
+    Returns (selected_battery, battery_bank_size, num_batteries).
+    """
+    selected_battery = st.selectbox(
+        "Select Battery Size", BATTERIES_BY_VOLTAGE[system_voltage], key=key)
+    battery_bank_size = get_load_totals()[3] / float(system_voltage)
+    num_batteries = calculate_number_of_batteries(battery_bank_size, float(selected_battery[1]))
+
+    st.metric("Battery Bank Size", f"{battery_bank_size:.2f} Ah")
+    st.metric("Number of Batteries", f"{num_batteries}")
+    return selected_battery, battery_bank_size, num_batteries
+
+
+def _solar_section(key_prefix: str) -> tuple:
+    """
+    Shared solar block; widget keys are prefixed per flow. Returns
+    (peak_sun_hours, selected_panel_size, total_required_wattage, num_panels).
+    """
+    total_day_energy_demand = get_load_totals()[2]
+    peak_sun_hours = st.number_input("Peak Sun Hours", min_value=1.0, value=5.0,
+                                     step=0.1, key=key_prefix + "peak_sun_hours")
+    selected_panel_size = st.selectbox("Select Panel Size", PANEL_SIZES,
+                                       key=key_prefix + "panel_size")
+    total_required_wattage = total_day_energy_demand / (peak_sun_hours * 0.8 * 0.8)
+    num_panels = calculate_number_of_panels(
+        total_day_energy_demand, float(selected_panel_size), peak_sun_hours, 0.8 * 0.8)
+
+    st.metric("Total Required Wattage", f"{total_required_wattage:.2f} W")
+    st.metric("Number of Panels", f"{num_panels}")
+    return peak_sun_hours, selected_panel_size, total_required_wattage, num_panels
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def sweep_table(daily_wh: float, panel_wattage: float):
+    """
+    Labelled sensitivity grid for the solar page expander. Memoized so a
+    rerun with unchanged demand and panel size reuses the built frame
+    (and its row/column labels) instead of re-running the sweep and
+    re-formatting every header string.
+    """
+    import pandas as pd  # deferred: only needed when the expander renders
+
+    sun_hours_range = np.arange(3.0, 7.5, 0.5)
+    efficiency_range = np.arange(0.50, 0.95, 0.05)
+    counts = panel_sweep(daily_wh, panel_wattage, sun_hours_range, efficiency_range)
+    return pd.DataFrame(counts,
+                        index=[f"{eff:.2f}" for eff in efficiency_range],
+                        columns=[f"{sun:.1f} h" for sun in sun_hours_range])
+
+
 def load_page():
     st.subheader("Load Input")
     if "loads" not in st.session_state:
-        st.session_state["loads"] = []
-
-    load_name = st.text_input("Load Name")
-    quantity = st.number_input("Quantity", min_value=1.0, value=1.0, step=1.0)
-    wattage = st.number_input("Wattage (W)", min_value=1.0, value=100.0, step=1.0)
-    day_hours = st.number_input("Day Hours", min_value=0.0, value=1.0, step=1.0)
-    night_hours = st.number_input("Night Hours", min_value=0.0, value=1.0, step=1.0)
-    peak_power_surge = st.checkbox("Peak Power Surge")
-
-    if st.button("Add Load"):
-        peak_power = wattage * quantity
-        peak_power_surge_value = peak_power * 3 if peak_power_surge else peak_power
-        day_energy_demand = wattage * quantity * day_hours
-        night_energy_demand = wattage * quantity * night_hours
-        st.session_state["loads"].append({
-            "name": load_name,
-            "quantity": quantity,
-            "wattage": wattage,
-            "day_hours": day_hours,
-            "night_hours": night_hours,
-            "peak_power": peak_power,
-            "peak_power_surge": peak_power_surge_value,
-            "day_energy_demand": day_energy_demand,
-            "night_energy_demand": night_energy_demand
-        })
-
-    # Display Load Table
+        st.session_state["loads"] = _restore_loads()
+        if not st.session_state["loads"]:
+            st.session_state["load_totals"] = (0.0, 0.0, 0.0, 0.0)
+
+    _add_load_form()
+
+    # Display Load Table: one editable grid widget instead of O(N) per-row
+    # widgets; dynamic rows cover both edits and removals
     if st.session_state["loads"]:
         st.write("### Load Table")
-        st.table(st.session_state["loads"])
+        loads_df = loads_dataframe(st.session_state["loads"])
+        edited = st.data_editor(
+            loads_df[LOAD_EDIT_COLUMNS], num_rows="dynamic", key="loads_editor",
+            column_config={
+                "quantity": st.column_config.NumberColumn(required=True, min_value=1.0),
+                "wattage": st.column_config.NumberColumn(required=True, min_value=1.0),
+                "day_hours": st.column_config.NumberColumn(required=True, min_value=0.0),
+                "night_hours": st.column_config.NumberColumn(required=True, min_value=0.0),
+            },
+        )
+        if not edited.equals(loads_df[LOAD_EDIT_COLUMNS]):
+            st.session_state["loads"] = _loads_from_editor(edited, loads_df["id"])
+            _persist_replace(st.session_state["loads"])
+            st.session_state.pop("load_totals", None)
+            st.session_state.pop("max_peak_power", None)
+            st.rerun()
 
         # Calculate Totals
-        total_peak_power = sum(load["peak_power"] for load in st.session_state["loads"])
-        total_peak_power_surge = sum(load["peak_power_surge"] for load in st.session_state["loads"])
-        total_day_energy_demand = sum(load["day_energy_demand"] for load in st.session_state["loads"])
-        total_night_energy_demand = sum(load["night_energy_demand"] for load in st.session_state["loads"])
+        _totals_metrics()
 
-        st.metric("Total Peak Power", f"{total_peak_power} W")
-        st.metric("Total Peak Power Surge", f"{total_peak_power_surge} W")
-        st.metric("Total Day Energy Demand", f"{total_day_energy_demand} Wh")
-        st.metric("Total Night Energy Demand", f"{total_night_energy_demand} Wh")
-
-        if st.button("Proceed to Inverter Size Calculations"):
-            st.session_state["page"] = "inverter"
+        st.button("Proceed to Inverter Size Calculations", on_click=_go_to_page, args=("inverter",))
 
 
 def inverter_page():
+    require_loads()
     # Inverter Size Calculation
-    total_peak_power = sum(load["peak_power"] for load in st.session_state["loads"])
-    inverter_size = total_peak_power * 1.2
-    inverter_size_rounded = round(inverter_size / 0.5) * 0.5
-
-    # Determine System Voltage
-    if 1000 <= inverter_size_rounded <= 1500:
-        system_voltage = 12
-    elif 1500 < inverter_size_rounded <= 3000:
-        system_voltage = 24
-    elif 3000 < inverter_size_rounded <= 5000:
-        system_voltage = 48
-    else:
-        system_voltage = 48
+    inverter_size_rounded, system_voltage = _inverter_section()
 
-    st.write("### Inverter Size and System Voltage")
-    st.metric("Inverter Size", f"{inverter_size_rounded} kVA")
-    st.metric("System Voltage", f"{system_voltage} V")
+    st.session_state.setdefault("sizing", {}).update(
+        inverter_kva=inverter_size_rounded, system_voltage=system_voltage)
 
-    if st.button("Proceed to Battery Bank Calculations"):
-        st.session_state["system_voltage"] = system_voltage
-        st.session_state["page"] = "battery"
+    st.button("Proceed to Battery Bank Calculations", on_click=_go_to_page,
+              args=("battery",), kwargs={"system_voltage": system_voltage})
 
 
 def battery_page():
+    require_loads()
     # Battery Bank Calculations
     st.write("### Battery Bank Calculations")
     system_voltage = st.session_state.get("system_voltage", 12)
-    total_night_energy_demand = sum(load["night_energy_demand"] for load in st.session_state["loads"])
+    total_night_energy_demand = get_load_totals()[3]
 
-    battery_options = [
-        (12, 75), (12, 100), (12, 200),
-        (24, 75), (24, 100), (24, 200),
-        (48, 75), (48, 100), (48, 200)
-    ]
-    available_batteries = [(v, ah) for v, ah in battery_options if v == system_voltage]
-    selected_battery = st.selectbox("Select Battery Size", available_batteries)
-    battery_bank_size = total_night_energy_demand / system_voltage
-    num_batteries = math.ceil(battery_bank_size / selected_battery[1])
+    # Nothing runs at night: skip the bank sizing entirely
+    if total_night_energy_demand == 0:
+        st.info("No nighttime energy demand \u2014 no battery bank is required.")
+        st.session_state.setdefault("sizing", {}).update(num_batteries=0, battery_ah=0)
+        st.button("Proceed to Solar Panel Calculations", on_click=_go_to_page, args=("solar",))
+        return
 
-    st.metric("Battery Bank Size", f"{battery_bank_size:.2f} Ah")
-    st.metric("Number of Batteries", f"{num_batteries}")
+    selected_battery, battery_bank_size, num_batteries = _battery_bank_section(
+        system_voltage, key="battery_size")
+
+    st.session_state.setdefault("sizing", {}).update(
+        num_batteries=num_batteries, battery_ah=selected_battery[1])
 
-    if st.button("Proceed to Solar Panel Calculations"):
-        st.session_state["page"] = "solar"
+    st.button("Proceed to Solar Panel Calculations", on_click=_go_to_page, args=("solar",))
 
 
 def solar_page():
+    require_loads()
     # Solar Panel Calculations
     st.write("### Solar Panel Calculations")
-    total_day_energy_demand = sum(load["day_energy_demand"] for load in st.session_state["loads"])
-    peak_sun_hours = st.number_input("Peak Sun Hours", min_value=1.0, value=5.0, step=0.1)
-    selected_panel_size = st.selectbox("Select Panel Size", [160, 320, 410, 475, 490, 550, 640])
-    total_required_wattage = total_day_energy_demand / (peak_sun_hours * 0.8 * 0.8)
-    num_panels = math.ceil(total_required_wattage / selected_panel_size)
+    total_day_energy_demand = get_load_totals()[2]
+    (peak_sun_hours, selected_panel_size,
+     total_required_wattage, num_panels) = _solar_section(key_prefix="")
 
-    st.metric("Total Required Wattage", f"{total_required_wattage:.2f} W")
-    st.metric("Number of Panels", f"{num_panels}")
+    # One vectorized sweep instead of a per-cell helper-call double loop
+    with st.expander("Panel Count Sensitivity (sun hours vs. efficiency)"):
+        st.dataframe(sweep_table(total_day_energy_demand, float(selected_panel_size)))
 
-    if st.button("Proceed to Final Summary"):
-        st.session_state["page"] = "summary"
+    st.session_state.setdefault("sizing", {}).update(
+        num_panels=num_panels, panel_size=selected_panel_size)
+
+    st.button("Proceed to Final Summary", on_click=_go_to_page, args=("summary",))
 
 
 def summary_page():
-    # Final Summary
+    require_loads()
+    # Final Summary: read the results the earlier pages stored instead of
+    # re-rendering their widgets and recomputing the same math
     st.write("### Final System Summary")
-    system_voltage = st.session_state.get("system_voltage", 12)
-    total_night_energy_demand = sum(load["night_energy_demand"] for load in st.session_state["loads"])
-    battery_options = [
-        (12, 75), (12, 100), (12, 200),
-        (24, 75), (24, 100), (24, 200),
-        (48, 75), (48, 100), (48, 200)
-    ]
-    available_batteries = [(v, ah) for v, ah in battery_options if v == system_voltage]
-    selected_battery = st.selectbox("Select Battery Size", available_batteries)
-    battery_bank_size = total_night_energy_demand / system_voltage
-    num_batteries = math.ceil(battery_bank_size / selected_battery[1])
-
-    total_day_energy_demand = sum(load["day_energy_demand"] for load in st.session_state["loads"])
-    peak_sun_hours = st.number_input("Peak Sun Hours", min_value=1.0, value=5.0, step=0.1)
-    selected_panel_size = st.selectbox("Select Panel Size", [160, 320, 410, 475, 490, 550, 640])
-    total_required_wattage = total_day_energy_demand / (peak_sun_hours * 0.8 * 0.8)
-    num_panels = math.ceil(total_required_wattage / selected_panel_size)
+    sizing = st.session_state.get("sizing", {})
+    system_voltage = sizing.get("system_voltage", 12)
+
+    if sizing.get("num_batteries"):
+        st.write(f"We need: {sizing['num_batteries']} * {sizing['battery_ah']}Ah batteries ({system_voltage}V)")
+    else:
+        st.write("No battery bank required.")
+    st.write(f"1 * {sizing.get('inverter_kva', 0)} kVA inverter")
+    st.write(f"{sizing.get('num_panels', 0)} * {sizing.get('panel_size', 0)}W solar panels")
+
 
-    st.write(f"We need: {num_batteries} * {selected_battery[1]}Ah batteries ({system_voltage}V)")
-    st.write(f"1 * {round(sum(load['peak_power'] for load in st.session_state['loads']) * 1.2 / 0.5) * 0.5} kVA inverter")
-    st.write(f"{num_panels} * {selected_panel_size}W solar panels")
+def render_custom_specs_sidebar() -> tuple:
+    """
+    Render the technical-spec sidebar and return
+    (battery_dod, panel_imp, panel_voc, inverter_vmax, inverter_vmin, inverter_ic).
+    """
+    st.sidebar.header("Custom Specifications")
+    battery_dod = st.sidebar.number_input("Battery Depth of Discharge (DoD)", min_value=0.1, max_value=1.0, value=DEFAULT_BATTERY_DOD["Lithium"], step=0.1)
+    panel_imp = st.sidebar.number_input("Panel Current at Max Power (Imp)", min_value=1.0, value=DEFAULT_PANEL_IMP, step=1.0)
+    panel_voc = st.sidebar.number_input("Panel Open Circuit Voltage (Voc)", min_value=1.0, value=DEFAULT_PANEL_VOC, step=1.0)
+    inverter_vmax = st.sidebar.number_input("Inverter Max MPPT Voltage (Vmax)", min_value=1.0, value=DEFAULT_INVERTER_VMAX, step=1.0)
+    inverter_vmin = st.sidebar.number_input("Inverter Min MPPT Voltage (Vmin)", min_value=1.0, value=DEFAULT_INVERTER_VMIN, step=1.0)
+    inverter_ic = st.sidebar.number_input("Inverter Current (Ic)", min_value=1.0, value=DEFAULT_INVERTER_IC, step=1.0)
+    return battery_dod, panel_imp, panel_voc, inverter_vmax, inverter_vmin, inverter_ic
 
 
 def technical_user_page():
     st.title("Technical User Solar Sizing Tool")
 
-    # Set initial page to 'load' if not set
-    if 'page' not in st.session_state:
-        st.session_state['page'] = 'load'
+    # User input for custom specifications
+    battery_dod, panel_imp, panel_voc, inverter_vmax, inverter_vmin, inverter_ic = render_custom_specs_sidebar()
 
-    # Default specifications
-    default_battery_dod = {"Lithium": 0.8, "Gel": 0.5}
-    default_panel_imp = 11.0  # Current at max power (A)
-    default_panel_voc = 53.3  # Open Circuit Voltage (V)
-    default_inverter_vmax = 430.0  # Max MPPT Voltage (V)
-    default_inverter_vmin = 120.0  # Min MPPT Voltage (V)
-    default_inverter_ic = 100.0  # Inverter Current (A)
+    # Tabs instead of a Proceed-button cascade: tab selection lives on the
+    # client, so switching steps costs no rerun and earlier steps are not
+    # collapsed and recomputed when a later input changes. The tabs render
+    # top-down, so each step's session-state results are available to the
+    # steps after it within the same run.
+    load_tab, inverter_tab, battery_tab, solar_tab, summary_tab = st.tabs(
+        ["Load Input", "Inverter", "Battery Bank", "Solar Panels", "Summary"])
 
-    # User input for custom specifications
-    st.sidebar.header("Custom Specifications")
-    battery_dod = st.sidebar.number_input("Battery Depth of Discharge (DoD)", min_value=0.1, max_value=1.0, value=default_battery_dod["Lithium"], step=0.1)
-    panel_imp = st.sidebar.number_input("Panel Current at Max Power (Imp)", min_value=1.0, value=default_panel_imp, step=1.0)
-    panel_voc = st.sidebar.number_input("Panel Open Circuit Voltage (Voc)", min_value=1.0, value=default_panel_voc, step=1.0)
-    inverter_vmax = st.sidebar.number_input("Inverter Max MPPT Voltage (Vmax)", min_value=1.0, value=default_inverter_vmax, step=1.0)
-    inverter_vmin = st.sidebar.number_input("Inverter Min MPPT Voltage (Vmin)", min_value=1.0, value=default_inverter_vmin, step=1.0)
-    inverter_ic = st.sidebar.number_input("Inverter Current (Ic)", min_value=1.0, value=default_inverter_ic, step=1.0)
-
-    # Page Navigation based on session state
-    current_page = st.session_state.get('page', 'load')
-
-    if current_page == 'load':
-        # Load input and calculations
+    with load_tab:
         st.subheader("Load Input")
         if "loads" not in st.session_state:
-            st.session_state["loads"] = []
-
-        load_name = st.text_input("Load Name")
-        quantity = st.number_input("Quantity", min_value=1.0, value=1.0, step=1.0)
-        wattage = st.number_input("Wattage (W)", min_value=1.0, value=100.0, step=1.0)
-        day_hours = st.number_input("Day Hours", min_value=0.0, value=1.0, step=1.0)
-        night_hours = st.number_input("Night Hours", min_value=0.0, value=1.0, step=1.0)
-        peak_power_surge = st.checkbox("Peak Power Surge")
-
-        if st.button("Add Load"):
-            peak_power = wattage * quantity
-            peak_power_surge_value = peak_power * 3 if peak_power_surge else peak_power
-            day_energy_demand = wattage * quantity * day_hours
-            night_energy_demand = wattage * quantity * night_hours
-            st.session_state["loads"].append({
-                "name": load_name,
-                "quantity": quantity,
-                "wattage": wattage,
-                "day_hours": day_hours,
-                "night_hours": night_hours,
-                "peak_power": peak_power,
-                "peak_power_surge": peak_power_surge_value,
-                "day_energy_demand": day_energy_demand,
-                "night_energy_demand": night_energy_demand
-            })
+            st.session_state["loads"] = _restore_loads()
+            if not st.session_state["loads"]:
+                st.session_state["load_totals"] = (0.0, 0.0, 0.0, 0.0)
+
+        _add_load_form()
 
         # Display Load Table
         if st.session_state["loads"]:
             st.write("### Load Table")
-            st.table(st.session_state["loads"])
+            st.dataframe(loads_dataframe(st.session_state["loads"]).drop(columns=["id"]),
+                         use_container_width=True)
+
+            # Batch removals: all selected loads drop in one comprehension
+            # pass instead of one list shift per removed row. The form keeps
+            # each selection change on the client; the script only reruns
+            # once, on submit, instead of per added/removed selection
+            load_labels = {load["id"]: load["name"] for load in st.session_state["loads"]}
+            with st.form("remove_loads"):
+                st.multiselect("Remove Loads", list(load_labels),
+                               format_func=load_labels.get, key="tech_remove_loads")
+                st.form_submit_button("Apply Removals", on_click=_apply_removals)
 
             # Calculate Totals
-            total_peak_power = sum(load["peak_power"] for load in st.session_state["loads"])
-            total_peak_power_surge = sum(load["peak_power_surge"] for load in st.session_state["loads"])
-            total_day_energy_demand = sum(load["day_energy_demand"] for load in st.session_state["loads"])
-            total_night_energy_demand = sum(load["night_energy_demand"] for load in st.session_state["loads"])
-
-            st.metric("Total Peak Power", f"{total_peak_power} W")
-            st.metric("Total Peak Power Surge", f"{total_peak_power_surge} W")
-            st.metric("Total Day Energy Demand", f"{total_day_energy_demand} Wh")
-            st.metric("Total Night Energy Demand", f"{total_night_energy_demand} Wh")
+            _totals_metrics()
 
-            if st.button("Proceed to Inverter Size Calculations"):
-                st.session_state["page"] = "inverter"
-                st.rerun()
+    if not st.session_state.get("loads"):
+        for tab in (inverter_tab, battery_tab, solar_tab, summary_tab):
+            with tab:
+                st.info("Add at least one load in the Load Input tab first.")
+        return
 
-    elif current_page == "inverter":
+    with inverter_tab:
         # Inverter Size Calculation
-        total_peak_power = sum(load["peak_power"] for load in st.session_state["loads"])
-        inverter_size = total_peak_power * 1.2
-        inverter_size_rounded = round(inverter_size / 0.5) * 0.5
-
-        # Determine System Voltage
-        if 1000 <= inverter_size_rounded <= 1500:
-            system_voltage = 12
-        elif 1500 < inverter_size_rounded <= 3000:
-            system_voltage = 24
-        elif 3000 < inverter_size_rounded <= 5000:
-            system_voltage = 48
-        else:
-            system_voltage = 48
+        inverter_size_rounded, system_voltage = _inverter_section()
 
         # Store calculations in session state
         st.session_state["inverter_size_rounded"] = inverter_size_rounded
+        st.session_state["system_voltage"] = system_voltage
 
-        st.write("### Inverter Size and System Voltage")
-        st.metric("Inverter Size", f"{inverter_size_rounded} kVA")
-        st.metric("System Voltage", f"{system_voltage} V")
-
-        if st.button("Proceed to Battery Bank Calculations"):
-            st.session_state["system_voltage"] = system_voltage
-            st.session_state["page"] = "battery"
-            st.rerun()
-
-    elif current_page == "battery":
-        total_night_energy_demand = sum(load["night_energy_demand"] for load in st.session_state["loads"])
+    with battery_tab:
+        total_night_energy_demand = get_load_totals()[3]
         system_voltage = st.session_state.get("system_voltage", 12)
 
         st.write("### Technical Battery Bank Calculations")
-        battery_options = [
-            (12, 75), (12, 100), (12, 200),
-            (24, 75), (24, 100), (24, 200),
-            (48, 75), (48, 100), (48, 200)
-        ]
-        available_batteries = [(v, ah) for v, ah in battery_options if v == system_voltage]
-        selected_battery = st.selectbox("Select Battery Size", available_batteries)
-        battery_bank_size = total_night_energy_demand / system_voltage
-        num_batteries = math.ceil(battery_bank_size / selected_battery[1])
+        if total_night_energy_demand == 0:
+            st.info("No nighttime energy demand \u2014 no battery bank is required.")
+        selected_battery, battery_bank_size, num_batteries = _battery_bank_section(
+            system_voltage, key="tech_battery_size")
 
         # Calculate max batteries in parallel and series
         max_batteries_parallel = total_night_energy_demand / (selected_battery[1] * battery_dod)
-        max_batteries_series = system_voltage / selected_battery[0]
+        max_batteries_series = float(system_voltage) / selected_battery[0]
 
         # Store calculations in session state
         st.session_state["selected_battery"] = selected_battery
@@ -367,23 +797,15 @@ def technical_user_page():
         st.session_state["max_batteries_parallel"] = max_batteries_parallel
         st.session_state["max_batteries_series"] = max_batteries_series
 
-        st.metric("Battery Bank Size", f"{battery_bank_size:.2f} Ah")
-        st.metric("Number of Batteries", f"{num_batteries}")
         st.metric("Max Batteries in Parallel", f"{max_batteries_parallel:.0f}")
         st.metric("Max Batteries in Series", f"{max_batteries_series:.0f}")
 
-        if st.button("Proceed to Solar Panel Calculations"):
-            st.session_state["page"] = "solar"
-            st.rerun()
-
-    elif current_page == "solar":
-        total_day_energy_demand = sum(load["day_energy_demand"] for load in st.session_state["loads"])
+    with solar_tab:
+        total_day_energy_demand = get_load_totals()[2]
 
         st.write("### Technical Solar Panel Calculations")
-        peak_sun_hours = st.number_input("Peak Sun Hours", min_value=1.0, value=5.0, step=0.1)
-        selected_panel_size = st.selectbox("Select Panel Size", [160, 320, 410, 475, 490, 550, 640])
-        total_required_wattage = total_day_energy_demand / (peak_sun_hours * 0.8 * 0.8)
-        num_panels = math.ceil(total_required_wattage / selected_panel_size)
+        (peak_sun_hours, selected_panel_size,
+         total_required_wattage, num_panels) = _solar_section(key_prefix="tech_")
 
         # Calculate max panels in parallel and series
         max_panels_parallel = inverter_ic / panel_imp
@@ -397,32 +819,14 @@ def technical_user_page():
         st.session_state["max_panels_series_vmax"] = max_panels_series_vmax
         st.session_state["max_panels_series_vmin"] = max_panels_series_vmin
 
-        st.metric("Total Required Wattage", f"{total_required_wattage:.2f} W")
-        st.metric("Number of Panels", f"{num_panels}")
         st.metric("Max Panels in Parallel", f"{max_panels_parallel:.0f}")
         st.metric("Max Panels in Series (Vmax)", f"{max_panels_series_vmax:.0f}")
         st.metric("Max Panels in Series (Vmin)", f"{max_panels_series_vmin:.0f}")
 
-        if st.button("Proceed to Final Summary"):
-            st.session_state["page"] = "summary"
-            st.rerun()
-
-    elif current_page == "summary":
+    with summary_tab:
         st.write("### Final Technical System Summary")
-        
-        # Retrieve values from session state
-        selected_battery = st.session_state.get("selected_battery")
-        num_batteries = st.session_state.get("num_batteries")
-        system_voltage = st.session_state.get("system_voltage")
-        selected_panel_size = st.session_state.get("selected_panel_size")
-        num_panels = st.session_state.get("num_panels")
-        max_batteries_parallel = st.session_state.get("max_batteries_parallel")
-        max_batteries_series = st.session_state.get("max_batteries_series")
-        max_panels_parallel = st.session_state.get("max_panels_parallel")
-        max_panels_series_vmax = st.session_state.get("max_panels_series_vmax")
-        max_panels_series_vmin = st.session_state.get("max_panels_series_vmin")
-        inverter_size_rounded = st.session_state.get("inverter_size_rounded")
 
+        # Everything below was stored by the earlier tabs during this run
         st.write(f"We need: {num_batteries} * {selected_battery[1]}Ah batteries ({system_voltage}V)")
         st.write(f"1 * {inverter_size_rounded} kVA inverter")
         st.write(f"{num_panels} * {selected_panel_size}W solar panels")
@@ -433,6 +837,27 @@ def technical_user_page():
         st.write(f"Max Panels in Series (Vmin): {max_panels_series_vmin:.0f}")
 
 
+@st.fragment
+def _conversation_management_fragment():
+    """
+    Sidebar fragment: viewing or clearing the history reruns only this
+    block instead of the whole assistant page.
+    """
+    st.header("Conversation Management")
+
+    # View Conversation History
+    if st.button("View Conversation History"):
+        st.write("### Conversation History")
+        for idx, message in enumerate(st.session_state.conversation_history, 1):
+            role = "👤 User" if message['role'] == 'user' else "🤖 AI"
+            st.text(f"{role}: {message['content']}")
+
+    # Clear Conversation History
+    if st.button("Clear Conversation History"):
+        st.session_state.conversation_history = []
+        st.success("Conversation history has been cleared.")
+
+
 def ai_powered_solar_assistant_page():
     # Initialize conversation history in session state if not exists
     if 'conversation_history' not in st.session_state:
@@ -440,19 +865,7 @@ def ai_powered_solar_assistant_page():
 
     # Sidebar for conversation management
     with st.sidebar:
-        st.header("Conversation Management")
-        
-        # View Conversation History
-        if st.button("View Conversation History"):
-            st.write("### Conversation History")
-            for idx, message in enumerate(st.session_state.conversation_history, 1):
-                role = "👤 User" if message['role'] == 'user' else "🤖 AI"
-                st.text(f"{role}: {message['content']}")
-        
-        # Clear Conversation History
-        if st.button("Clear Conversation History"):
-            st.session_state.conversation_history = []
-            st.success("Conversation history has been cleared.")
+        _conversation_management_fragment()
 
     st.title("AI Powered Solar Assistant")
 
@@ -467,10 +880,11 @@ def ai_powered_solar_assistant_page():
 
         if st.button("Get AI Recommendations"):
             if user_inputs and goals:
-                # Prepare messages with system context
+                # Prepare messages with system context; the instructions
+                # live in the system message so the requirements and goals
+                # are sent once, not as a second near-identical user turn
                 messages = [
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": f"Based on these inputs: {user_inputs} and goals: {goals}, provide a personalized solar system sizing recommendation."}
+                    {"role": "system", "content": "You are a helpful assistant. When given system requirements and goals, provide a comprehensive, personalized solar system sizing recommendation."}
                 ]
                 
                 # Add previous conversation context
@@ -479,27 +893,26 @@ def ai_powered_solar_assistant_page():
                 # Add current user input
                 current_user_message = {
                     "role": "user", 
-                    "content": f"System Requirements: {user_inputs}\nGoals: {goals}\n\nProvide a comprehensive, personalized solar system sizing recommendation."
+                    "content": f"System Requirements: {user_inputs}\nGoals: {goals}"
                 }
                 messages.append(current_user_message)
 
                 # Get recommendation
                 try:
-                    completion = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=messages
-                    )
-                    recommendations = completion.choices[0].message.content.strip()
-                    
-                    # Display recommendations
+                    # Display recommendations as they stream in
                     st.write("### Personalized Recommendations")
-                    st.write(recommendations)
+                    recommendations = _stream_chat(
+                        tuple((m["role"], m["content"]) for m in messages))
                     
                     # Store the recommendation and user input in conversation history
                     st.session_state.conversation_history.extend([
                         current_user_message,
                         {"role": "assistant", "content": recommendations}
                     ])
+                    # Keep the context window bounded: the full history is
+                    # resent with every request, so cap it at the last 20
+                    # messages to hold payload size (and latency) constant
+                    del st.session_state.conversation_history[:-20]
                 
                 except Exception as e:
                     st.error(f"Error generating recommendations: {str(e)}")
@@ -525,21 +938,17 @@ def ai_powered_solar_assistant_page():
 
                 # Get answer
                 try:
-                    completion = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=messages
-                    )
-                    answer = completion.choices[0].message.content.strip()
-                    
-                    # Display answer
+                    # Display the answer as it streams in
                     st.write("### Answer")
-                    st.write(answer)
+                    answer = _stream_chat(
+                        tuple((m["role"], m["content"]) for m in messages))
                     
                     # Store the query and answer in conversation history
                     st.session_state.conversation_history.extend([
                         current_query_message,
                         {"role": "assistant", "content": answer}
                     ])
+                    del st.session_state.conversation_history[:-20]
                 
                 except Exception as e:
                     st.error(f"Error generating answer: {str(e)}")
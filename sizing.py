@@ -0,0 +1,320 @@
+"""
+Pure sizing math for the solar PV tool.
+
+Single source of truth for the energy, panel, battery and inverter
+helpers. Nothing in here touches Streamlit, so the functions can be
+imported, cached or benchmarked independently of the web app.
+"""
+
+from bisect import bisect_left
+from operator import itemgetter
+from typing import List, Dict
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to plain Python
+    njit = None
+
+
+# Relative tolerance for snapping near-integer quotients in _ceil_div
+_CEIL_EPS = 1e-9
+
+def _ceil_div(a: float, b: float) -> int:
+    """
+    Ceiling division via the floor-divide identity -(-q // 1): one divide,
+    no math.ceil call, and exact for integer operands. Quotients within a
+    relative epsilon of a whole number snap to it first, so float residue
+    (e.g. 3.0000000000000004 panels) cannot charge a whole extra unit.
+    """
+    q = a / b
+    nearest = round(q)
+    if abs(q - nearest) <= _CEIL_EPS * max(1.0, abs(nearest)):
+        return int(nearest)
+    return int(-(-q // 1.0))
+
+def _appliance_arrays(appliances: List[Dict], fields: List[str]) -> List[np.ndarray]:
+    """
+    Convert a list of appliance dicts to one float64 array per field
+    (structure-of-arrays layout), so aggregations run as single NumPy calls.
+    """
+    n = len(appliances)
+    return [
+        np.fromiter((appl[field] for appl in appliances), dtype=np.float64, count=n)
+        for field in fields
+    ]
+
+def _aggregate(wattage: np.ndarray, day_hours: np.ndarray,
+               night_hours: np.ndarray, use_at_night: np.ndarray):
+    """
+    Aggregate the appliance arrays in a single pass.
+
+    Returns (daily_wh, nighttime_wh, total_wattage). ``use_at_night`` is a
+    0.0/1.0 mask so the nighttime term stays branch-free. Compiled with
+    Numba when it is installed.
+    """
+    daily = 0.0
+    night = 0.0
+    total = 0.0
+    for i in range(wattage.shape[0]):
+        daily += wattage[i] * day_hours[i]
+        night += wattage[i] * night_hours[i] * use_at_night[i]
+        total += wattage[i]
+    return daily, night, total
+
+def _aggregate_numpy(wattage: np.ndarray, day_hours: np.ndarray,
+                     night_hours: np.ndarray, use_at_night: np.ndarray):
+    """
+    NumPy implementation of :func:`_aggregate`: BLAS dot products and a sum
+    instead of an interpreted per-element loop. Used when Numba is absent,
+    where a plain-Python loop over ndarrays would be the slowest option.
+    """
+    return (
+        float(np.dot(wattage, day_hours)),
+        float(np.dot(wattage * use_at_night, night_hours)),
+        float(wattage.sum()),
+    )
+
+def _totals(wattage: np.ndarray, quantity: np.ndarray, day_hours: np.ndarray,
+            night_hours: np.ndarray, surge: np.ndarray):
+    """
+    Four-in-one reduction over the load columns. Returns
+    (total_peak_power, total_peak_power_surge, total_day_energy_demand,
+    total_night_energy_demand); peak power is formed once per element and
+    feeds all four accumulators. Compiled with Numba when it is installed.
+    """
+    tp = 0.0
+    tps = 0.0
+    td = 0.0
+    tn = 0.0
+    for i in range(wattage.shape[0]):
+        pp = wattage[i] * quantity[i]
+        tp += pp
+        tps += pp * 3.0 if surge[i] > 0 else pp
+        td += pp * day_hours[i]
+        tn += pp * night_hours[i]
+    return tp, tps, td, tn
+
+def _totals_numpy(wattage: np.ndarray, quantity: np.ndarray, day_hours: np.ndarray,
+                  night_hours: np.ndarray, surge: np.ndarray):
+    """
+    NumPy implementation of :func:`_totals`, used when Numba is absent.
+    """
+    peak_power = wattage * quantity
+    surged = np.where(surge > 0, peak_power * 3.0, peak_power)
+    return (
+        float(peak_power.sum()),
+        float(surged.sum()),
+        float(np.dot(peak_power, day_hours)),
+        float(np.dot(peak_power, night_hours)),
+    )
+
+if njit is None:
+    _aggregate = _aggregate_numpy
+    _totals = _totals_numpy
+else:
+    # Eager signatures compile at import time (persisted via cache=True),
+    # replacing the previous warmup call: the kernels are ready before the
+    # first user interaction and never specialize twice
+    _aggregate = njit("UniTuple(f8, 3)(f8[:], f8[:], f8[:], f8[:])",
+                      cache=True, fastmath=True)(_aggregate)
+    _totals = njit("UniTuple(f8, 4)(f8[:], f8[:], f8[:], f8[:], f8[:])",
+                   cache=True, fastmath=True)(_totals)
+
+# Below this element count, building arrays and dispatching to NumPy/Numba
+# costs more than just running the reduction in the interpreter. The
+# crossover sits higher without a compiled kernel: the NumPy fallback
+# pays the same array construction but gains less per element
+_SMALL_N = 8 if njit is not None else 16
+
+# One C-level call per row instead of five keyed dict lookups in the
+# small-N interpreter paths
+_LOAD_FIELDS = itemgetter("wattage", "quantity", "day_hours", "night_hours", "surge")
+
+def load_arrays(loads: List[Dict], fields: List[str]) -> List[np.ndarray]:
+    """
+    Structure-of-arrays view of the load table: one contiguous float64
+    column per requested field, ready for vectorized reductions.
+    """
+    return _appliance_arrays(loads, fields)
+
+def compute_load_totals(loads: List[Dict]) -> tuple:
+    """
+    Compute (total_peak_power, total_peak_power_surge,
+    total_day_energy_demand, total_night_energy_demand) in one fused pass:
+    peak power is formed once and shared by all four reductions instead of
+    each total re-walking the table.
+    """
+    if len(loads) < _SMALL_N:
+        tp = tps = td = tn = 0.0
+        for load in loads:
+            wattage, quantity, day_hours, night_hours, surge = _LOAD_FIELDS(load)
+            pp = wattage * quantity
+            tp += pp
+            tps += pp * 3.0 if surge else pp
+            td += pp * day_hours
+            tn += pp * night_hours
+        return tp, tps, td, tn
+    wattage, quantity, day_hours, night_hours, surge = load_arrays(
+        loads, ["wattage", "quantity", "day_hours", "night_hours", "surge"])
+    return _totals(wattage, quantity, day_hours, night_hours, surge)
+
+def compute_energy_totals(appliances: List[Dict]) -> tuple:
+    """
+    Compute (daily_wh, nighttime_wh, total_wattage) in one pass over the
+    appliance list instead of traversing it once per metric.
+    """
+    n = len(appliances)
+    if n < _SMALL_N:
+        daily = night = total = 0.0
+        for appl in appliances:
+            wattage = appl["wattage"]
+            daily += wattage * appl["hours_per_day"]
+            if appl["use_at_night"]:
+                night += wattage * appl["night_hours"]
+            total += wattage
+        return daily, night, total
+    wattage, day_hours, night_hours = _appliance_arrays(
+        appliances, ["wattage", "hours_per_day", "night_hours"])
+    use_at_night = np.fromiter(
+        (float(appl["use_at_night"]) for appl in appliances), dtype=np.float64, count=n)
+    return _aggregate(wattage, day_hours, night_hours, use_at_night)
+
+def totals_from_arrays(wattage: np.ndarray, quantity: np.ndarray,
+                       day_hours: np.ndarray, night_hours: np.ndarray,
+                       surge: np.ndarray) -> tuple:
+    """
+    SoA entry point for :func:`compute_load_totals`: callers that already
+    hold the float64 columns go straight to the fused kernel.
+    """
+    return _totals(wattage, quantity, day_hours, night_hours, surge)
+
+def energy_totals_from_arrays(wattage: np.ndarray, day_hours: np.ndarray,
+                              night_hours: np.ndarray, use_at_night: np.ndarray) -> tuple:
+    """
+    SoA entry point: compute (daily_wh, nighttime_wh, total_wattage) for
+    callers that already hold the column arrays, skipping the
+    list-of-dicts conversion entirely.
+    """
+    return _aggregate(wattage, day_hours, night_hours, use_at_night)
+
+def calculate_daily_energy_usage(appliances: List[Dict]) -> float:
+    """
+    Calculate total daily energy usage (Wh) for a list of appliances.
+    """
+    daily_wh, _, _ = compute_energy_totals(appliances)
+    return daily_wh
+
+def calculate_nighttime_energy_usage(appliances: List[Dict]) -> float:
+    """
+    Calculate the total nighttime energy usage (Wh) for selected appliances.
+    """
+    _, nighttime_wh, _ = compute_energy_totals(appliances)
+    return nighttime_wh
+
+def calculate_number_of_panels(total_wh: float, panel_wattage: float, sun_hours: float, efficiency: float) -> int:
+    """
+    Calculate the number of solar panels needed.
+    """
+    if panel_wattage <= 0 or sun_hours <= 0 or efficiency <= 0:
+        return 0
+    # One fused denominator: a single FP divide inside the ceiling instead
+    # of dividing by the sun-hours term and the panel wattage separately
+    return _ceil_div(total_wh, panel_wattage * sun_hours * efficiency)
+
+def calculate_battery_capacity(total_wh: float, voltage: float, dod: float, efficiency: float) -> float:
+    """
+    Calculate required battery capacity (Ah).
+    """
+    # Compute the reciprocal once and multiply; in a sensitivity sweep this
+    # keeps the per-sample cost to a multiply rather than a divide
+    inv_denom = 1.0 / (voltage * dod * efficiency)
+    return total_wh * inv_denom
+
+def calculate_number_of_batteries(total_ah: float, single_battery_ah: float) -> int:
+    """
+    Calculate the number of batteries needed.
+    """
+    if single_battery_ah <= 0:
+        return 0
+    return _ceil_div(total_ah, single_battery_ah)
+
+def calculate_inverter_size(appliances: List[Dict]) -> float:
+    """
+    Estimate inverter size (W).
+    """
+    _, _, total_wattage = compute_energy_totals(appliances)
+    return total_wattage * 1.25
+
+def size_system(wattage: np.ndarray, day_hours: np.ndarray, night_hours: np.ndarray,
+                use_at_night: np.ndarray, panel_wattage: float, sun_hours: float,
+                efficiency: float, voltage: float, dod: float,
+                round_trip_efficiency: float, single_battery_ah: float) -> tuple:
+    """
+    Run the whole sizing pipeline in one call over the SoA columns:
+    a single fused pass (the compiled :func:`_aggregate` kernel when Numba
+    is present) produces the energy totals, then the O(1) scalar helpers
+    finish panels, battery bank and inverter without touching the arrays
+    again. Returns (daily_wh, nighttime_wh, num_panels,
+    battery_capacity_ah, num_batteries, inverter_size_w).
+    """
+    daily_wh, nighttime_wh, total_wattage = _aggregate(
+        wattage, day_hours, night_hours, use_at_night)
+    battery_ah = calculate_battery_capacity(
+        nighttime_wh, voltage, dod, round_trip_efficiency)
+    return (
+        daily_wh,
+        nighttime_wh,
+        calculate_number_of_panels(daily_wh, panel_wattage, sun_hours, efficiency),
+        battery_ah,
+        calculate_number_of_batteries(battery_ah, single_battery_ah),
+        total_wattage * 1.25,
+    )
+
+# Safety margin applied to the peak power before choosing an inverter;
+# the doubled scale is folded in ahead of time so the rating below stays
+# one multiply and one round
+INVERTER_MARGIN = 1.2
+_INVERTER_SCALE = INVERTER_MARGIN * 2
+
+def inverter_rating(total_peak_power: float) -> float:
+    """
+    Inverter rating from total peak power: ``INVERTER_MARGIN`` headroom
+    rounded to the nearest 0.5 step. The margin and the half-step
+    rounding fuse into round(x * scale) / 2 — no divide.
+    """
+    return round(total_peak_power * _INVERTER_SCALE) / 2
+
+def panel_sweep(daily_wh: float, panel_wattage: float,
+                sun_hours_range: np.ndarray, efficiency_range: np.ndarray) -> np.ndarray:
+    """
+    Panel counts over a (sun hours x efficiency) grid as one vectorized
+    expression; rows follow ``efficiency_range``, columns
+    ``sun_hours_range``. Replaces what would otherwise be a double loop of
+    calculate_number_of_panels calls.
+    """
+    sun, eff = np.meshgrid(sun_hours_range, efficiency_range)
+    production = panel_wattage * sun * eff
+    with np.errstate(divide="ignore"):
+        counts = np.ceil(daily_wh / production)
+    return np.where(production > 0, counts, 0).astype(np.int32)
+
+# Voltage policy as sorted bound/value tables: one bisection per call
+# instead of an if/elif chain, and a single place to edit the thresholds
+# shared by both entry points below. Plain tuples and bisect_left beat
+# np.searchsorted here — scalar lookups skip the ndarray boxing entirely.
+_SYSTEM_KVA_BOUNDS = (1.5, 5.0)
+_INVERTER_W_BOUNDS = (1500.0, 3000.0)
+_BATTERY_VOLTAGES = (12, 24, 48)
+
+def determine_battery_voltage(system_size: float) -> int:
+    """
+    Determine appropriate battery bank voltage from system size in kVA.
+    """
+    return _BATTERY_VOLTAGES[bisect_left(_SYSTEM_KVA_BOUNDS, system_size)]
+
+def determine_system_voltage(inverter_size_w: float) -> int:
+    """
+    Determine the system voltage from the rounded inverter size in watts.
+    """
+    return _BATTERY_VOLTAGES[bisect_left(_INVERTER_W_BOUNDS, inverter_size_w)]